@@ -1,50 +1,69 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request
 from flask_cors import CORS
 from Bio.Seq import Seq
-from Bio.SeqUtils import molecular_weight, gc_fraction, IsoelectricPoint
-import os, re, json
+from Bio.SeqUtils import gc_fraction, IsoelectricPoint
+import os, json
+import orjson
+
+from bioquimica import lru_cache_corto, normalizar, peso_molecular, translate_to_stop
 
 app = Flask(__name__)
 CORS(app)
 
+
+def ojson(datos, status=200):
+    """Respuesta JSON serializada con orjson."""
+    return app.response_class(orjson.dumps(datos), status=status, mimetype="application/json")
+
+
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 
 # ---- Funciones bioquímicas ----
+_DEL_DNA = str.maketrans("", "", "ATCGN")
+_DEL_RNA = str.maketrans("", "", "AUCGN")
+_DEL_PROT = str.maketrans("", "", "ACDEFGHIKLMNPQRSTVWY")
+
+
 def detectar_tipo(secuencia: str) -> str:
     secuencia = secuencia.strip().upper()
-    if re.fullmatch(r"[ATCGN]+", secuencia):
+    if not secuencia:
+        return "Desconocido"
+    if not secuencia.translate(_DEL_DNA):
         return "ADN"
-    elif re.fullmatch(r"[AUCGN]+", secuencia):
+    elif not secuencia.translate(_DEL_RNA):
         return "ARN"
-    elif re.fullmatch(r"[ACDEFGHIKLMNPQRSTVWY]+", secuencia):
+    elif not secuencia.translate(_DEL_PROT):
         return "Proteína"
     return "Desconocido"
 
 
 def analizar_secuencia(secuencia: str) -> dict:
     tipo = detectar_tipo(secuencia)
-    secuencia = secuencia.upper().replace(" ", "").replace("\n", "")
+    secuencia = normalizar(secuencia)
+    return dict(_analizar_cacheado(secuencia, tipo))
+
+
+@lru_cache_corto(maxsize=2048)
+def _analizar_cacheado(secuencia: str, tipo: str) -> tuple:
+    """Cálculo de analizar_secuencia, memorizado como pares (clave, valor)."""
     resultado = {"tipo": tipo, "entrada": secuencia}
 
     if tipo == "ADN":
         seq = Seq(secuencia)
-        arn = seq.transcribe()
-        prot = arn.translate(to_stop=True)
         resultado.update({
-            "ARN": str(arn),
-            "Proteína": str(prot),
+            "ARN": secuencia.replace("T", "U"),
+            "Proteína": translate_to_stop(secuencia),
             "GC%": round(gc_fraction(seq) * 100, 2),
-            "Peso_molecular_DNA": round(molecular_weight(seq, "DNA"), 2)
+            "Peso_molecular_DNA": round(peso_molecular(secuencia, "DNA"), 2)
         })
     elif tipo == "ARN":
-        seq = Seq(secuencia)
-        prot = seq.translate(to_stop=True)
+        gc = (secuencia.count("G") + secuencia.count("C")) / len(secuencia)
         resultado.update({
-            "Proteína": str(prot),
-            "GC%": round(gc_fraction(seq.back_transcribe()) * 100, 2),
-            "Peso_molecular_RNA": round(molecular_weight(seq, "RNA"), 2)
+            "Proteína": translate_to_stop(secuencia),
+            "GC%": round(gc * 100, 2),
+            "Peso_molecular_RNA": round(peso_molecular(secuencia, "RNA"), 2)
         })
     elif tipo == "Proteína":
         seq = Seq(secuencia)
@@ -54,13 +73,13 @@ def analizar_secuencia(secuencia: str) -> dict:
         except Exception:
             pI = "No calculable"
         resultado.update({
-            "Peso_molecular_proteína": round(molecular_weight(seq, "protein"), 2),
+            "Peso_molecular_proteína": round(peso_molecular(secuencia, "protein"), 2),
             "Punto_isoelectrico": pI,
             "Longitud": len(secuencia)
         })
     else:
         resultado["error"] = "No se pudo identificar el tipo de secuencia."
-    return resultado
+    return tuple(resultado.items())
 
 
 # ---- Rutas Flask ----
@@ -73,18 +92,18 @@ def index():
 def analizar():
     data = request.get_json()
     secuencia = data.get("secuencia", "")
-    return jsonify(analizar_secuencia(secuencia))
+    return ojson(analizar_secuencia(secuencia))
 
 
 @app.route("/upload_pdb", methods=["POST"])
 def upload_pdb():
     file = request.files["file"]
     if not file:
-        return jsonify({"error": "No se recibió ningún archivo"}), 400
+        return ojson({"error": "No se recibió ningún archivo"}, 400)
 
     filepath = os.path.join(UPLOAD_FOLDER, file.filename)
     file.save(filepath)
-    return jsonify({"filename": file.filename})
+    return ojson({"filename": file.filename})
 
 
 if __name__ == "__main__":
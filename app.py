@@ -1,16 +1,92 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from transformers import pipeline
 from flask_cors import CORS
-from Bio.Seq import Seq
-from Bio import SeqIO, SeqUtils
+from Bio import SeqIO
+from functools import lru_cache
+import diskcache
 import io
+import os
+import re
+import threading
+import numpy as np
+import orjson
+import torch
+import xxhash
+
+from bioquimica import (
+    ADN, ARN, diferencias, histograma, lru_cache_corto, normalizar, peso_molecular,
+    resumen_adn, solo_letras, translate_to_stop,
+)
 
 app = Flask(__name__)
 CORS(app)
 
-print("🚀 Cargando modelo genético (flan-t5-base)...")
-qa_pipeline = pipeline("text2text-generation", model="google/flan-t5-base")
-print("✅ Modelo cargado correctamente y listo para análisis genético.")
+
+def ojson(datos, status=200):
+    """Respuesta JSON serializada con orjson."""
+    return app.response_class(orjson.dumps(datos), status=status, mimetype="application/json")
+
+
+# Respuestas JSON de /cargar-secuencia y /upload, indexadas por el hash del archivo.
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_upload_cache = diskcache.Cache(os.path.join(_BASE_DIR, ".upload_cache"))
+
+
+def _version_codigo():
+    """Hash de los fuentes del análisis: si cambian, las respuestas cacheadas dejan de valer."""
+    h = xxhash.xxh3_64()
+    for nombre in ("app.py", "bioquimica.py"):
+        with open(os.path.join(_BASE_DIR, nombre), "rb") as fuente:
+            h.update(fuente.read())
+    return h.hexdigest()
+
+_VERSION_CACHE = _version_codigo()
+
+
+def _clave_archivo(archivo, *partes):
+    """Hash xxh3 del archivo subido (leído por bloques) junto a ``partes``."""
+    h = xxhash.xxh3_64()
+    for bloque in iter(lambda: archivo.stream.read(1 << 20), b""):
+        h.update(bloque)
+    archivo.stream.seek(0)
+    return ":".join((_VERSION_CACHE, *partes, h.hexdigest()))
+
+
+_qa_pipeline = None
+# Los pipelines de transformers no son thread-safe (gunicorn usa gthread).
+_qa_lock = threading.RLock()
+
+
+def get_qa():
+    """Carga flan-t5-base (bfloat16, CPU) la primera vez que se necesita."""
+    global _qa_pipeline
+    with _qa_lock:
+        if _qa_pipeline is not None:
+            return _qa_pipeline
+        print("🚀 Cargando modelo genético (flan-t5-base)...")
+        _qa_pipeline = pipeline(
+            "text2text-generation",
+            model="google/flan-t5-base",
+            torch_dtype=torch.bfloat16,
+            device="cpu",
+        )
+        print("✅ Modelo cargado correctamente y listo para análisis genético.")
+    return _qa_pipeline
+
+
+@lru_cache(maxsize=1024)
+def _llm_answer(pregunta: str) -> str:
+    """Genera (y memoriza) la explicación del modelo para una pregunta."""
+    input_text = f"Explica con lenguaje genético avanzado: {pregunta}"
+    with _qa_lock:
+        return get_qa()(input_text, max_new_tokens=200)[0]["generated_text"]
+
+
+# Bajo gunicorn --preload (gunicorn.conf.py) el modelo se carga en el proceso
+# maestro antes del fork; con el servidor de desarrollo se sigue cargando al
+# primer uso.
+if __name__ != "__main__" and os.environ.get("PRECARGAR_MODELO") == "1":
+    get_qa()
 
 
 # ----------------------------------------------------------
@@ -22,40 +98,38 @@ def preguntar():
         data = request.get_json(force=True)
         pregunta = data.get("pregunta", "").strip()
     except Exception:
-        return jsonify({"respuesta": "⚠️ Error al interpretar la solicitud JSON."}), 400
+        return ojson({"respuesta": "⚠️ Error al interpretar la solicitud JSON."}, 400)
 
     if not pregunta:
-        return jsonify({"respuesta": "⚠️ No se recibió ninguna pregunta genética."}), 400
+        return ojson({"respuesta": "⚠️ No se recibió ninguna pregunta genética."}, 400)
 
-    texto_upper = pregunta.upper().replace(" ", "")
+    texto_upper = normalizar(pregunta)
 
     # 1️⃣ Comparación de secuencias
     if "COMPARA" in texto_upper:
         respuesta_comp = comparar_secuencias_en_texto(pregunta)
         if respuesta_comp:
-            return jsonify({"respuesta": respuesta_comp})
+            return ojson({"respuesta": respuesta_comp})
 
     # 2️⃣ Si es secuencia pura (ADN, ARN o proteína)
     if es_secuencia(texto_upper):
         tipo = detectar_tipo_secuencia(texto_upper)
         if tipo == "ADN":
-            return jsonify({"respuesta": analizar_secuencia_dna(texto_upper)})
+            return ojson({"respuesta": analizar_secuencia_dna(texto_upper)})
         elif tipo == "ARN":
-            return jsonify({"respuesta": analizar_secuencia_arn(texto_upper)})
+            return ojson({"respuesta": analizar_secuencia_arn(texto_upper)})
         elif tipo == "PROTEINA":
-            return jsonify({"respuesta": analizar_proteina(texto_upper)})
+            return ojson({"respuesta": analizar_proteina(texto_upper)})
 
     # 3️⃣ Preguntas teóricas
     respuesta_bio = procesar_pregunta_genetica(pregunta)
     if respuesta_bio:
-        return jsonify({"respuesta": respuesta_bio})
+        return ojson({"respuesta": respuesta_bio})
 
     # 4️⃣ IA avanzada para explicaciones generales
-    input_text = f"Explica con lenguaje genético avanzado: {pregunta}"
-    resultado = qa_pipeline(input_text, max_new_tokens=200)
-    respuesta = resultado[0]["generated_text"]
+    respuesta = _llm_answer(pregunta)
 
-    return jsonify({"respuesta": respuesta})
+    return ojson({"respuesta": respuesta})
 
 
 # ----------------------------------------------------------
@@ -65,21 +139,26 @@ def preguntar():
 def cargar_secuencia():
     """Permite subir un archivo FASTA o GenBank desde el frontend."""
     if 'archivo' not in request.files:
-        return jsonify({"respuesta": "⚠️ No se envió ningún archivo."}), 400
+        return ojson({"respuesta": "⚠️ No se envió ningún archivo."}, 400)
 
     archivo = request.files['archivo']
     nombre = archivo.filename.lower()
 
     try:
         if nombre.endswith(".fasta") or nombre.endswith(".fa"):
-            contenido = archivo.read().decode()
-            seq_record = SeqIO.read(io.StringIO(contenido), "fasta")
+            formato = "fasta"
         elif nombre.endswith(".gb") or nombre.endswith(".gbk"):
-            contenido = archivo.read().decode()
-            seq_record = SeqIO.read(io.StringIO(contenido), "genbank")
+            formato = "genbank"
         else:
-            return jsonify({"respuesta": "❌ Formato no compatible. Usa .fasta o .gbk"}), 400
+            return ojson({"respuesta": "❌ Formato no compatible. Usa .fasta o .gbk"}, 400)
 
+        clave = _clave_archivo(archivo, "cargar-secuencia", formato)
+        cacheada = _upload_cache.get(clave)
+        if cacheada is not None:
+            return app.response_class(cacheada, mimetype="application/json")
+
+        # Se lee directamente del stream subido, sin copiar el archivo a memoria
+        seq_record = SeqIO.read(io.TextIOWrapper(archivo.stream, encoding="utf-8"), formato)
         secuencia = str(seq_record.seq)
         tipo = detectar_tipo_secuencia(secuencia)
         if tipo == "ADN":
@@ -89,11 +168,13 @@ def cargar_secuencia():
         else:
             resultado = analizar_proteina(secuencia)
 
-        return jsonify({
+        respuesta = ojson({
             "respuesta": f"📄 Archivo leído correctamente ({tipo})\n\n{resultado}"
         })
+        _upload_cache.set(clave, respuesta.get_data())
+        return respuesta
     except Exception as e:
-        return jsonify({"respuesta": f"⚠️ Error al leer el archivo: {e}"}), 500
+        return ojson({"respuesta": f"⚠️ Error al leer el archivo: {e}"}, 500)
 
 
 # ----------------------------------------------------------
@@ -105,18 +186,18 @@ def es_secuencia(texto):
 
 def detectar_tipo_secuencia(seq):
     """Detecta automáticamente el tipo de secuencia."""
-    if set(seq).issubset({"A", "T", "C", "G"}):
+    datos = seq.encode("ascii", "replace")
+    if not datos.translate(None, ADN):
         return "ADN"
-    elif set(seq).issubset({"A", "U", "C", "G"}):
+    elif solo_letras(histograma(datos), ARN):
         return "ARN"
     else:
         return "PROTEINA"
 
+@lru_cache_corto(maxsize=2048)
 def analizar_secuencia_dna(seq):
-    dna = Seq(seq)
-    gc = round(SeqUtils.gc_fraction(dna) * 100, 2)
-    transcripcion = str(dna.transcribe())
-    traduccion = str(dna.translate(to_stop=True))
+    gc, transcripcion, traduccion = resumen_adn(seq.encode("ascii"), preview=80, maximo=50)
+    gc = round(gc / len(seq) * 100, 2) if seq else 0
     return (
         f"🧬 **Análisis de ADN**\n\n"
         f"📏 Longitud: {len(seq)} bases\n"
@@ -125,9 +206,9 @@ def analizar_secuencia_dna(seq):
         f"💠 Proteína: {traduccion[:50]}..."
     )
 
+@lru_cache_corto(maxsize=2048)
 def analizar_secuencia_arn(seq):
-    arnm = Seq(seq)
-    traduccion = str(arnm.translate(to_stop=True))
+    traduccion = translate_to_stop(seq)
     return (
         f"🧬 **Análisis de ARNm**\n\n"
         f"📏 Longitud: {len(seq)} bases\n"
@@ -135,9 +216,10 @@ def analizar_secuencia_arn(seq):
         f"🧩 Observación: ARNm puede derivarse de ADN mediante transcripción inversa."
     )
 
+@lru_cache_corto(maxsize=2048)
 def analizar_proteina(seq):
     aa_count = len(seq)
-    peso = round(SeqUtils.molecular_weight(Seq(seq), seq_type="protein"), 2)
+    peso = round(peso_molecular(seq, "protein"), 2)
     return (
         f"🧫 **Análisis de Proteína**\n\n"
         f"🔹 Longitud: {aa_count} aminoácidos\n"
@@ -146,31 +228,27 @@ def analizar_proteina(seq):
     )
 
 
+# Orden de prioridad: si aparecen varios temas, gana el primero de la tabla.
+_TOPIC_REPLIES = {
+    "CRISPR": "🧬 **CRISPR-Cas9**: sistema de edición genética que usa ARN guía para dirigir Cas9 al ADN.",
+    "MUTACION": "🔍 **Mutación Genética**: cambio en la secuencia de ADN que puede modificar la proteína resultante.",
+    "ARN": "💡 **Tipos de ARN**: ARNm (mensajero), ARNt (transferencia) y ARNr (ribosomal).",
+    "FASTA": "📁 Puedes subir archivos FASTA o GenBank en la sección de carga de secuencias.",
+    "GENBANK": "📁 Puedes subir archivos FASTA o GenBank en la sección de carga de secuencias.",
+}
+
 def procesar_pregunta_genetica(texto):
     texto_upper = texto.upper()
-    if "CRISPR" in texto_upper:
-        return "🧬 **CRISPR-Cas9**: sistema de edición genética que usa ARN guía para dirigir Cas9 al ADN."
-    if "MUTACION" in texto_upper:
-        return "🔍 **Mutación Genética**: cambio en la secuencia de ADN que puede modificar la proteína resultante."
-    if "ARN" in texto_upper:
-        return "💡 **Tipos de ARN**: ARNm (mensajero), ARNt (transferencia) y ARNr (ribosomal)."
-    if "FASTA" in texto_upper or "GENBANK" in texto_upper:
-        return "📁 Puedes subir archivos FASTA o GenBank en la sección de carga de secuencias."
+    for tema, respuesta in _TOPIC_REPLIES.items():
+        if tema in texto_upper:
+            return respuesta
     return None
 
 
+_SEQ_RE = re.compile(r"[ATCG]{6,}")
+
 def comparar_secuencias_en_texto(texto):
-    texto_upper = texto.upper().replace(" ", "")
-    secuencias, actual = [], ""
-    for ch in texto_upper:
-        if ch in "ATCG":
-            actual += ch
-        else:
-            if len(actual) > 5:
-                secuencias.append(actual)
-            actual = ""
-    if len(actual) > 5:
-        secuencias.append(actual)
+    secuencias = _SEQ_RE.findall(texto.upper().replace(" ", ""))
 
     if len(secuencias) < 2:
         return "❌ No se detectaron dos secuencias válidas."
@@ -179,23 +257,38 @@ def comparar_secuencias_en_texto(texto):
 
 
 def interpretar_mutaciones(seq1, seq2):
-    mutaciones = [(i + 1, seq1[i], seq2[i]) for i in range(min(len(seq1), len(seq2))) if seq1[i] != seq2[i]]
-    similitud = round((1 - len(mutaciones) / max(len(seq1), len(seq2))) * 100, 2)
-    tipo = "idénticas" if not mutaciones else "con diferencias"
+    pos, bases1, bases2 = diferencias(
+        np.frombuffer(seq1.encode("ascii"), np.uint8),
+        np.frombuffer(seq2.encode("ascii"), np.uint8),
+    )
+    similitud = round((1 - pos.size / max(len(seq1), len(seq2))) * 100, 2)
+    tipo = "idénticas" if not pos.size else "con diferencias"
     respuesta = (
         f"🧬 **Comparación Genética**\n"
         f"Similitud: {similitud}%\n"
         f"Estado: {tipo}\n"
     )
-    if mutaciones:
+    if pos.size:
+        mutaciones = zip(
+            (pos + 1).tolist(),
+            bases1.tobytes().decode("ascii"),
+            bases2.tobytes().decode("ascii"),
+        )
         respuesta += "🔬 Mutaciones detectadas:\n"
-        for pos, a, b in mutaciones:
-            respuesta += f"• Pos {pos}: {a}→{b}\n"
+        respuesta += "".join(f"• Pos {pos}: {a}→{b}\n" for pos, a, b in mutaciones)
     return respuesta
 # ----------------------------------------------------------
 # 🧬 BLOQUE COMPLEMENTARIO - Lectura avanzada de FASTA / GenBank
 # ----------------------------------------------------------
-from io import StringIO
+_PREVIEW_UPLOAD = 200
+_T2U_BYTES = bytes.maketrans(b"T", b"U")
+_U2T_BYTES = bytes.maketrans(b"U", b"T")
+
+def _vista_previa(datos, tabla, completo):
+    """Convierte solo los primeros bytes de la secuencia, salvo que se pida completa."""
+    if completo or len(datos) <= _PREVIEW_UPLOAD:
+        return datos.translate(tabla).decode("ascii")
+    return datos[:_PREVIEW_UPLOAD].translate(tabla).decode("ascii") + "..."
 
 @app.route('/upload', methods=['POST'])
 def upload():
@@ -203,13 +296,16 @@ def upload():
     Nueva ruta que permite subir archivos genéticos (FASTA / GenBank)
     y obtener un análisis estructurado: tipo de secuencia, longitud,
     %GC, transcripción y traducción.
+
+    La transcripción / retrotranscripción se devuelve recortada a los
+    primeros 200 nucleótidos; con ?full=1 se devuelve completa.
     """
     try:
         if 'file' not in request.files:
-            return jsonify({"error": "No se ha enviado ningún archivo"}), 400
+            return ojson({"error": "No se ha enviado ningún archivo"}, 400)
         
         archivo = request.files['file']
-        contenido = archivo.read().decode('utf-8')
+        completo = request.args.get('full') == '1'
 
         # Detectar formato automáticamente
         if archivo.filename.endswith(('.fasta', '.fa')):
@@ -217,26 +313,31 @@ def upload():
         elif archivo.filename.endswith(('.gb', '.gbk')):
             formato = 'genbank'
         else:
-            return jsonify({"error": "Formato de archivo no compatible. Usa .fasta o .gb"}), 400
+            return ojson({"error": "Formato de archivo no compatible. Usa .fasta o .gb"}, 400)
+
+        clave = _clave_archivo(archivo, "upload", formato, "full" if completo else "preview")
+        cacheada = _upload_cache.get(clave)
+        if cacheada is not None:
+            return app.response_class(cacheada, mimetype="application/json")
 
-        # Leer con BioPython
-        registros = list(SeqIO.parse(StringIO(contenido), formato))
-        if not registros:
-            return jsonify({"error": "No se encontró ninguna secuencia válida"}), 400
+        # Leer con BioPython, registro a registro desde el stream subido
+        registros = SeqIO.parse(io.TextIOWrapper(archivo.stream, encoding='utf-8'), formato)
 
         resultado_total = []
         for record in registros:
             secuencia = str(record.seq).upper()
+            datos = secuencia.encode("ascii", "replace")
+            hist = histograma(datos)
 
             # Detectar tipo de secuencia
             tipo = (
-                "ADN" if set(secuencia) <= set("ATGC") else
-                "ARN" if set(secuencia) <= set("AUGC") else
+                "ADN" if solo_letras(hist, ADN) else
+                "ARN" if solo_letras(hist, ARN) else
                 "Proteína"
             )
 
-            # Calcular GC%
-            gc = round((secuencia.count("G") + secuencia.count("C")) / len(secuencia) * 100, 2) if len(secuencia) > 0 else 0
+            # Calcular GC% (mismo histograma)
+            gc = round(int(hist[ord("G")] + hist[ord("C")]) / len(datos) * 100, 2) if len(datos) > 0 else 0
 
             analisis = {
                 "ID": record.id,
@@ -248,25 +349,28 @@ def upload():
 
             # Transcripción y traducción si aplica
             if tipo == "ADN":
-                arn = secuencia.replace("T", "U")
-                analisis["Transcripción (ARNm)"] = arn
+                analisis["Transcripción (ARNm)"] = _vista_previa(datos, _T2U_BYTES, completo)
                 try:
-                    analisis["Traducción (Proteína)"] = str(record.seq.translate(to_stop=True))
+                    analisis["Traducción (Proteína)"] = translate_to_stop(secuencia)
                 except Exception:
                     analisis["Traducción (Proteína)"] = "No se pudo traducir"
             elif tipo == "ARN":
-                adn = secuencia.replace("U", "T")
-                analisis["Retrotranscripción (ADN)"] = adn
+                analisis["Retrotranscripción (ADN)"] = _vista_previa(datos, _U2T_BYTES, completo)
 
             resultado_total.append(analisis)
 
-        return jsonify({
+        if not resultado_total:
+            return ojson({"error": "No se encontró ninguna secuencia válida"}, 400)
+
+        respuesta = ojson({
             "mensaje": f"Archivo procesado correctamente ({formato.upper()})",
             "datos": resultado_total
         })
+        _upload_cache.set(clave, respuesta.get_data())
+        return respuesta
 
     except Exception as e:
-        return jsonify({"error": f"Error interno al analizar archivo: {str(e)}"}), 500
+        return ojson({"error": f"Error interno al analizar archivo: {str(e)}"}, 500)
 
 
 # ----------------------------------------------------------
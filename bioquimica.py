@@ -0,0 +1,240 @@
+"""Utilidades bioquímicas compartidas por app.py y analizador_genetico.py."""
+from functools import lru_cache, wraps
+
+import numpy as np
+
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+
+# ---- Memorización ----
+# lru_cache limita entradas, no bytes: solo se memorizan secuencias cortas para
+# que una secuencia de varios MB no quede retenida en la caché.
+MAX_SECUENCIA_CACHE = 10_000
+
+
+def lru_cache_corto(maxsize: int):
+    """Como ``lru_cache``, pero sin memorizar si el primer argumento es largo."""
+    def decorador(funcion):
+        cacheada = lru_cache(maxsize=maxsize)(funcion)
+
+        @wraps(funcion)
+        def envoltura(secuencia, *args):
+            if len(secuencia) > MAX_SECUENCIA_CACHE:
+                return funcion(secuencia, *args)
+            return cacheada(secuencia, *args)
+
+        envoltura.cache_info = cacheada.cache_info
+        envoltura.cache_clear = cacheada.cache_clear
+        return envoltura
+    return decorador
+
+
+# ---- Código genético ----
+_BASES = "TCAG"
+_AMINOACIDOS = "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"
+
+_CODON_TABLE = {
+    a + b + c: _AMINOACIDOS[16 * i + 4 * j + k]
+    for i, a in enumerate(_BASES)
+    for j, b in enumerate(_BASES)
+    for k, c in enumerate(_BASES)
+}
+_STOP = frozenset(codon for codon, aa in _CODON_TABLE.items() if aa == "*")
+
+# Codones con N que solo pueden codificar un aminoácido (p. ej. GCN -> A).
+for _codon in list(_CODON_TABLE):
+    _ambiguo = _codon[:2] + "N"
+    if all(_CODON_TABLE[_codon[:2] + b] == _CODON_TABLE[_codon] for b in _BASES):
+        _CODON_TABLE[_ambiguo] = _CODON_TABLE[_codon]
+del _codon, _ambiguo
+
+_U2T = str.maketrans("U", "T")
+
+
+def translate_to_stop(dna: str) -> str:
+    """Traduce ADN o ARN hasta el primer codón de parada (tabla estándar)."""
+    dna = dna.translate(_U2T)
+    out = []
+    for i in range(0, len(dna) - len(dna) % 3, 3):
+        c = dna[i:i + 3]
+        if c in _STOP:
+            break
+        out.append(_CODON_TABLE.get(c, "X"))
+    return "".join(out)
+
+
+# ---- Composición de secuencias ----
+_NORM = str.maketrans({" ": None, "\n": None, "\r": None, "\t": None})
+
+
+def normalizar(secuencia: str) -> str:
+    """Quita espacios y saltos de línea y pasa a mayúsculas."""
+    return secuencia.translate(_NORM).upper()
+
+
+ADN = b"ATCG"
+ARN = b"AUCG"
+
+
+def histograma(datos: bytes) -> np.ndarray:
+    """Cuenta cuántas veces aparece cada byte (256 posiciones) en una pasada."""
+    return np.bincount(np.frombuffer(datos, dtype=np.uint8), minlength=256)
+
+
+@lru_cache(maxsize=None)
+def _mascara(letras: bytes) -> np.ndarray:
+    mascara = np.ones(256, dtype=bool)
+    mascara[list(letras)] = False
+    return mascara
+
+
+def solo_letras(hist: np.ndarray, letras: bytes) -> bool:
+    """Indica si el histograma solo contiene bytes de ``letras``."""
+    return not hist[_mascara(letras)].any()
+
+
+# ---- Pesos moleculares ----
+# Pesos promedio (Da) de Bio.Data.IUPACData; cadena lineal de una hebra.
+# Las tablas guardan diezmilésimas de Da en enteros: la suma es exacta y no
+# depende del orden en que NumPy acumula.
+_AGUA = 180153
+_PESOS = {
+    "DNA": {"A": 331.2218, "C": 307.1971, "G": 347.2212, "T": 322.2085},
+    "RNA": {"A": 347.2212, "C": 323.1965, "G": 363.2206, "U": 324.1813},
+    "protein": {
+        "A": 89.0932, "C": 121.1582, "D": 133.1027, "E": 147.1293, "F": 165.1891,
+        "G": 75.0666, "H": 155.1546, "I": 131.1729, "K": 146.1876, "L": 131.1729,
+        "M": 149.2113, "N": 132.1179, "O": 255.3134, "P": 115.1305, "Q": 146.1445,
+        "R": 174.201, "S": 105.0926, "T": 119.1192, "U": 168.0532, "V": 117.1463,
+        "W": 204.2252, "Y": 181.1885,
+    },
+}
+_TABLAS_PESO = {}
+for _tipo, _pesos in _PESOS.items():
+    _TABLAS_PESO[_tipo] = np.zeros(256, dtype=np.int64)
+    for _letra, _peso in _pesos.items():
+        _TABLAS_PESO[_tipo][ord(_letra)] = round(_peso * 10000)
+del _tipo, _pesos, _letra, _peso
+
+# Si es True se delega en Bio.SeqUtils.molecular_weight.
+PESO_CON_BIOPYTHON = False
+
+
+def peso_molecular(secuencia: str, tipo: str) -> float:
+    """Equivalente a ``Bio.SeqUtils.molecular_weight(secuencia, tipo)``."""
+    if PESO_CON_BIOPYTHON:
+        from Bio.SeqUtils import molecular_weight
+        return molecular_weight(secuencia, tipo)
+
+    # Mismo formateo mínimo que Biopython: sin espacios y en mayúsculas.
+    secuencia = "".join(secuencia.split()).upper()
+    pesos = _TABLAS_PESO[tipo][np.frombuffer(secuencia.encode("ascii", "replace"), np.uint8)]
+    if not pesos.all():
+        letra = secuencia[int(np.flatnonzero(pesos == 0)[0])]
+        raise ValueError(f"'{letra}' is not a valid unambiguous letter for {tipo}")
+    return (int(pesos.sum()) - (len(secuencia) - 1) * _AGUA) / 10000
+
+
+# ---- Comparación de secuencias ----
+def _scan_diffs(a, b, out_pos, out_a, out_b):
+    n = min(a.size, b.size)
+    k = 0
+    for i in range(n):
+        if a[i] != b[i]:
+            out_pos[k] = i
+            out_a[k] = a[i]
+            out_b[k] = b[i]
+            k += 1
+    return k
+
+
+if _NUMBA_AVAILABLE:
+    _scan_diffs = njit(cache=True)(_scan_diffs)
+    # Mismos tipos que en las llamadas reales: np.frombuffer da arrays de solo lectura.
+    _uno = np.frombuffer(b"A", np.uint8)
+    _scan_diffs(_uno, _uno, np.empty(1, np.int64), np.empty(1, np.uint8), np.empty(1, np.uint8))
+    del _uno
+
+
+def diferencias(a: np.ndarray, b: np.ndarray) -> tuple:
+    """Posiciones (desde 0) donde difieren dos arrays uint8 y las bases de cada uno."""
+    n = min(a.size, b.size)
+    if _NUMBA_AVAILABLE:
+        out_pos = np.empty(n, np.int64)
+        out_a = np.empty(n, np.uint8)
+        out_b = np.empty(n, np.uint8)
+        k = _scan_diffs(a, b, out_pos, out_a, out_b)
+        return out_pos[:k], out_a[:k], out_b[:k]
+    pos = np.nonzero(a[:n] != b[:n])[0]
+    return pos, a[pos], b[pos]
+
+
+# ---- Análisis de ADN en una sola pasada ----
+# Código de 2 bits por base (A=0, C=1, G=2, T=3) para indexar codones.
+_CODIGO_2BITS = np.zeros(256, np.uint8)
+for _i, _base in enumerate(b"ACGT"):
+    _CODIGO_2BITS[_base] = _i
+del _i, _base
+# Aminoácido (ASCII) para cada índice de codón de 6 bits.
+_AA_2BITS = np.frombuffer(
+    "".join(_CODON_TABLE[a + b + c] for a in "ACGT" for b in "ACGT" for c in "ACGT").encode("ascii"),
+    np.uint8,
+)
+_T2U = bytes.maketrans(b"T", b"U")
+
+
+def _recorrer_adn(bases, codigos, aminoacidos, arn, proteina):
+    gc = 0
+    k = 0
+    codon = 0
+    traduciendo = True
+    for i in range(len(bases)):
+        c = bases[i]
+        if c == 67 or c == 71:  # C, G
+            gc += 1
+        if i < len(arn):
+            arn[i] = 85 if c == 84 else c  # T -> U
+        if traduciendo:
+            codon = codon * 4 + codigos[c]
+            if i % 3 == 2:
+                aa = aminoacidos[codon]
+                codon = 0
+                if aa == 42 or k == len(proteina):  # "*" o vista previa completa
+                    traduciendo = False
+                else:
+                    proteina[k] = aa
+                    k += 1
+    return gc, k
+
+
+if _NUMBA_AVAILABLE:
+    _recorrer_adn = njit(cache=True)(_recorrer_adn)
+    # Las bases llegan de np.frombuffer (solo lectura): se compila esa firma.
+    _recorrer_adn(
+        np.frombuffer(b"A", np.uint8), _CODIGO_2BITS, _AA_2BITS,
+        np.empty(1, np.uint8), np.empty(1, np.uint8),
+    )
+
+
+def resumen_adn(datos: bytes, preview: int = 80, maximo: int = 50) -> tuple:
+    """Cuenta G+C y devuelve las vistas previas del ARNm y de la proteína.
+
+    ``datos`` es ADN solo con A/C/G/T. La proteína se traduce hasta el primer
+    codón de parada o hasta ``maximo`` aminoácidos. Con Numba todo se calcula
+    en una sola pasada compilada; sin Numba, el bucle en Python sería más lento
+    que ``bytes.count`` más una traducción limitada a los primeros codones.
+    """
+    if not _NUMBA_AVAILABLE:
+        return (
+            datos.count(b"G") + datos.count(b"C"),
+            datos[:preview].translate(_T2U).decode("ascii"),
+            translate_to_stop(datos[:3 * maximo].decode("ascii")),
+        )
+    arn = np.empty(min(preview, len(datos)), np.uint8)
+    proteina = np.empty(maximo, np.uint8)
+    gc, k = _recorrer_adn(np.frombuffer(datos, np.uint8), _CODIGO_2BITS, _AA_2BITS, arn, proteina)
+    return int(gc), arn.tobytes().decode("ascii"), proteina[:k].tobytes().decode("ascii")
@@ -0,0 +1,16 @@
+# ----------------------------------------------------------
+# 🚀 Servidor de producción (gunicorn lee este archivo automáticamente)
+#
+#   gunicorn app:app
+#   gunicorn analizador_genetico:app -b 0.0.0.0:5001
+#
+# Con preload_app la aplicación (y el modelo flan-t5 de app.py) se carga una
+# sola vez en el proceso maestro; los workers se crean con fork y comparten
+# esa memoria por copy-on-write.
+# ----------------------------------------------------------
+bind = "0.0.0.0:5000"
+workers = 4
+worker_class = "gthread"
+threads = 2
+preload_app = True
+raw_env = ["PRECARGAR_MODELO=1"]